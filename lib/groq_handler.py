@@ -1,55 +1,172 @@
-from groq import Groq
+import hashlib
+import re
+import threading
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 from utils.config import Config
+from utils.rate_limiter import TokenBucket
+
+# Matches Groq's Go-style "Please try again in 1h2m3s" / "in 1m2.5s" / "in 7.66s" / "in 520ms" hint
+_RETRY_HINT = re.compile(r"try again in (?:(\d+)h)?(?:(\d+)m(?!s))?(?:(\d+(?:\.\d+)?)(ms|s))?")
+_backoff = wait_exponential_jitter(initial=1, max=Config.GROQ_MAX_RETRY_WAIT)
+
+def _is_retryable(error):
+    """Check for the transient errors the Groq SDK itself retries, without importing groq at module load."""
+    from groq import APIConnectionError, APIStatusError
+    if isinstance(error, APIConnectionError):  # Includes APITimeoutError
+        return True
+    # 408 request timeout, 409 lock timeout, 429 rate limit and 5xx server errors
+    return isinstance(error, APIStatusError) and (error.status_code in (408, 409, 429) or error.status_code >= 500)
+
+def _retry_hint_seconds(error):
+    """Return the delay Groq asked for in a rate-limit error, or None if it gave no hint."""
+    match = _RETRY_HINT.search(str(error))
+    if not match:
+        return None
+    hours, minutes, amount, unit = match.groups()
+    if not (hours or minutes or amount):
+        return None
+    seconds = float(amount or 0) / 1000 if unit == "ms" else float(amount or 0)
+    return int(hours or 0) * 3600 + int(minutes or 0) * 60 + seconds
+
+def _hint_exceeds_cap(retry_state):
+    """Stop retrying when Groq asks for a longer wait than Config.GROQ_MAX_RETRY_WAIT (e.g. daily token limits)."""
+    hint = _retry_hint_seconds(retry_state.outcome.exception())
+    return hint is not None and hint > Config.GROQ_MAX_RETRY_WAIT
+
+def _wait_for_retry(retry_state):
+    """Wait as long as Groq asks when it says so, otherwise back off exponentially with jitter."""
+    hint = _retry_hint_seconds(retry_state.outcome.exception())
+    return hint if hint is not None else _backoff(retry_state)
+
+def _log_retry(retry_state):
+    """Log each retry through the handler's logger."""
+    handler = retry_state.args[0]
+    handler.logger.warning("Groq request failed (%s), retrying in %.1fs (attempt %d of %d)",
+                           type(retry_state.outcome.exception()).__name__, retry_state.next_action.sleep,
+                           retry_state.attempt_number, Config.GROQ_MAX_RETRIES)
 
 class GroqHandler:
     """Class to handle interactions with the Groq API."""
     def __init__(self, logger, prompt_loader):
         self.logger = logger
         self.prompt_loader = prompt_loader
+        self._cache = {}  # Exact-match cache of completed analyses
+        self._cache_lock = threading.Lock()
+        self._bucket = TokenBucket(rate=Config.GROQ_RPM / 60, capacity=Config.GROQ_RPM)
         self.logger.debug("Initializing GroqHandler")
         try:
             Config.validate()  # Ensure API key is set
-            self.client = Groq(api_key=Config.GROQ_API_KEY)
+            import httpx
+            from groq import Groq  # Deferred so importing this module stays cheap
+            http_client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=Config.GROQ_MAX_CONNECTIONS,
+                                    max_keepalive_connections=Config.GROQ_MAX_KEEPALIVE_CONNECTIONS),
+                timeout=httpx.Timeout(Config.GROQ_TIMEOUT, connect=Config.GROQ_CONNECT_TIMEOUT)
+            )
+            # Retries, including the SDK's own transient-error cases, are handled in _create_completion
+            self.client = Groq(api_key=Config.GROQ_API_KEY, max_retries=0, http_client=http_client)
             self.logger.debug("GroqHandler initialized successfully")
         except Exception as e:
             self.logger.error("Error initializing Groq client: %s", str(e))
             raise ValueError(f"Error initializing Groq client: {str(e)}")
 
-    def analyze_text(self, prompt, text, model="gemma2-9b-it", max_tokens=2000, temperature=0):
-        """Analyze text using the Groq API."""
+    @retry(retry=retry_if_exception(_is_retryable), wait=_wait_for_retry,
+           stop=stop_after_attempt(Config.GROQ_MAX_RETRIES) | _hint_exceeds_cap, before_sleep=_log_retry, reraise=True)
+    def _create_completion(self, **kwargs):
+        """Send one chat completion request, throttled by the token bucket."""
+        self._bucket.acquire()
+        return self.client.chat.completions.create(**kwargs)
+
+    def analyze_text(self, prompt, text, model="gemma2-9b-it", max_tokens=2000, temperature=0, chunk_size=3000,
+                     stream=False):
+        """Analyze text using the Groq API; chunk_size=None sends the text in a single request.
+
+        With stream=True, returns a generator yielding the final response as it is generated.
+        """
         self.logger.debug("Starting text analysis with model: %s, max_tokens: %d", model, max_tokens)
+        text = self.truncate_text(text)
+        key = hashlib.sha256(f"{model}|{max_tokens}|{temperature}|{chunk_size}|{prompt}\n\n{text}".encode()).hexdigest()
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            self.logger.debug("Cache hit for text analysis: %s", key)
+            return iter([cached]) if stream else cached
+        if stream:
+            return self._stream_text(key, prompt, text, model, max_tokens, temperature, chunk_size)
         try:
-            max_length = 3000
-            chunks = [text[i:i + max_length] for i in range(0, len(text), max_length)]
-            partial_responses = []
-
-            for i, chunk in enumerate(chunks):
-                self.logger.debug("Processing chunk %d of %d", i + 1, len(chunks))
-                response = self.client.chat.completions.create(
-                    messages=[{"role": "user", "content": prompt + "\n\n" + chunk}],
-                    model=model,
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
-                partial_responses.append(response.choices[0].message.content.strip())
-                self.logger.debug("Chunk %d processed", i + 1)
-
-            if len(partial_responses) > 1:
-                self.logger.debug("Combining %d partial responses", len(partial_responses))
-                combine_prompt = self.prompt_loader.get_prompt("combine_partial_responses")
-                combined_text = "\n\n".join(partial_responses)
-                final_response = self.client.chat.completions.create(
-                    messages=[{"role": "user", "content": combine_prompt + "\n\n" + combined_text}],
-                    model=model,
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
-                result = final_response.choices[0].message.content.strip()
-            else:
-                result = partial_responses[0]
-
+            content = self._final_content(prompt, text, model, max_tokens, temperature, chunk_size)
+            response = self._create_completion(
+                messages=[{"role": "user", "content": content}],
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            result = response.choices[0].message.content.strip()
+            self._store_cached(key, result)
             self.logger.debug("Text analysis completed")
             return result
         except Exception as e:
             self.logger.error("Error processing text with Groq API: %s", str(e))
-            raise Exception(f"Error processing text with Groq API: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error processing text with Groq API: {str(e)}")
+
+    def truncate_text(self, text, max_tokens=Config.MAX_INPUT_TOKENS):
+        """Cut text to an estimated token budget, using Config.CHARS_PER_TOKEN as the heuristic."""
+        max_chars = max_tokens * Config.CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        self.logger.warning("Truncating input from ~%d to %d tokens", len(text) // Config.CHARS_PER_TOKEN, max_tokens)
+        return text[:max_chars]
+
+    def _stream_text(self, key, prompt, text, model, max_tokens, temperature, chunk_size):
+        """Yield the final response token by token, caching the full text once complete."""
+        try:
+            content = self._final_content(prompt, text, model, max_tokens, temperature, chunk_size)
+            response = self._create_completion(
+                messages=[{"role": "user", "content": content}],
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            parts = []
+            for chunk in response:
+                delta = chunk.choices[0].delta.content or ""
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            self.logger.error("Error streaming text from Groq API: %s", str(e))
+            raise Exception(f"Error streaming text from Groq API: {str(e)}")
+        self._store_cached(key, "".join(parts).strip())
+        self.logger.debug("Streamed text analysis completed")
+
+    def _final_content(self, prompt, text, model, max_tokens, temperature, chunk_size):
+        """Build the message for the final request, first analyzing each chunk when the text is split."""
+        max_length = chunk_size or max(len(text), 1)
+        chunk_count = -(-len(text) // max_length)  # Ceiling division
+        if chunk_count <= 1:
+            return prompt + "\n\n" + text
+
+        chunks = (text[i:i + max_length] for i in range(0, len(text), max_length))
+        partial_responses = []
+        for i, chunk in enumerate(chunks):
+            self.logger.debug("Processing chunk %d of %d", i + 1, chunk_count)
+            response = self._create_completion(
+                messages=[{"role": "user", "content": prompt + "\n\n" + chunk}],
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            partial_responses.append(response.choices[0].message.content.strip())
+            self.logger.debug("Chunk %d processed", i + 1)
+
+        self.logger.debug("Combining %d partial responses", len(partial_responses))
+        combine_prompt = self.prompt_loader.get_prompt("combine_partial_responses")
+        return combine_prompt + "\n\n" + "\n\n".join(partial_responses)
+
+    def _store_cached(self, key, result):
+        """Store a completed analysis, evicting the oldest entry when full."""
+        with self._cache_lock:
+            if len(self._cache) >= Config.GROQ_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))  # Evict the oldest entry
+            self._cache[key] = result
\ No newline at end of file
@@ -1,24 +1,152 @@
+import json
+import re
+from utils.config import Config
+
 class ResumeAnalyzer:
     """Class to analyze resumes using GroqHandler."""
-    def __init__(self, groq_handler, logger, prompt_loader):
+    def __init__(self, groq_handler, logger, prompt_loader, analysis_cache=None):
         self.grok = groq_handler
         self.logger = logger
         self.prompt_loader = prompt_loader
+        self.analysis_cache = analysis_cache
 
-    def analyze_resume(self, text, designation, experience, domain):
-        """Analyze resume text."""
+    def analyze_resume(self, text, designation, experience, domain, stream=False):
+        """Analyze resume text; with stream=True, returns a generator of response text."""
         self.logger.debug("Starting resume analysis for designation: %s, experience: %s, domain: %s",
                          designation, experience, domain)
         try:
+            if self.analysis_cache is not None:
+                cached = self.analysis_cache.lookup(text, designation, experience, domain)
+                if cached is not None:
+                    self.logger.debug("Resume analysis served from analysis cache")
+                    return iter([cached]) if stream else cached
+
             prompt = self.prompt_loader.get_prompt(
                 "resume_analysis",
                 designation=designation,
                 experience=experience,
                 domain=domain
             )
+            if stream:
+                return self._stream_and_cache(
+                    self.grok.analyze_text(prompt, text, max_tokens=1500, stream=True),
+                    text, designation, experience, domain
+                )
             result = self.grok.analyze_text(prompt, text, max_tokens=1500)
+            if self.analysis_cache is not None:
+                self.analysis_cache.store(text, designation, experience, domain, result)
             self.logger.debug("Resume analysis completed")
             return result
         except Exception as e:
             self.logger.error("Error analyzing resume: %s", str(e))
-            raise Exception(f"Error analyzing resume: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error analyzing resume: {str(e)}")
+
+    def _stream_and_cache(self, tokens, text, designation, experience, domain):
+        """Pass streamed text through, then store the full analysis in the analysis cache."""
+        parts = []
+        for token in tokens:
+            parts.append(token)
+            yield token
+        if self.analysis_cache is not None:
+            self.analysis_cache.store(text, designation, experience, domain, "".join(parts).strip())
+        self.logger.debug("Streamed resume analysis completed")
+
+    def analyze_batch(self, texts, designation, experience, domain):
+        """Analyze several resumes, sending uncached ones to Groq in shared batch requests."""
+        self.logger.debug("Starting batch analysis of %d resumes for designation: %s, experience: %s, domain: %s",
+                         len(texts), designation, experience, domain)
+        try:
+            results = [None] * len(texts)
+            pending = []
+            for i, text in enumerate(texts):
+                if self.analysis_cache is not None:
+                    results[i] = self.analysis_cache.lookup(text, designation, experience, domain)
+                if results[i] is None:
+                    pending.append(i)
+            self.logger.debug("%d of %d resumes served from analysis cache", len(texts) - len(pending), len(texts))
+
+            for group in self._plan_groups(pending, texts, designation, experience, domain):
+                analyses = self._analyze_group([texts[i] for i in group], designation, experience, domain)
+                for i, analysis in zip(group, analyses):
+                    results[i] = analysis
+                    if self.analysis_cache is not None:
+                        self.analysis_cache.store(texts[i], designation, experience, domain, analysis)
+
+            self.logger.debug("Batch analysis completed")
+            return results
+        except Exception as e:
+            self.logger.error("Error analyzing resume batch: %s", str(e))
+            raise Exception(f"Error analyzing resume batch: {str(e)}")
+
+    @staticmethod
+    def _estimate_tokens(text):
+        """Estimate a text's token count with the Config.CHARS_PER_TOKEN heuristic, rounding up."""
+        return -(-len(text) // Config.CHARS_PER_TOKEN)
+
+    def _batch_prompt(self, count, designation, experience, domain):
+        """Build the batch analysis prompt for `count` resumes."""
+        return self.prompt_loader.get_prompt(
+            "resume_batch_analysis",
+            count=count,
+            designation=designation,
+            experience=experience,
+            domain=domain
+        )
+
+    def _plan_groups(self, indices, texts, designation, experience, domain):
+        """Split resumes into batches whose full text fits the model context; a resume that fits no batch goes alone."""
+        groups, group, group_tokens = [], [], 0
+        for i in indices:
+            tokens = self._estimate_tokens(texts[i]) + 8  # Plus its "## Resume N" header
+            if group:
+                count = len(group) + 1
+                # Input must fit in the context alongside the prompt and the requested output
+                available = (Config.MODEL_CONTEXT_TOKENS - Config.CONTEXT_RESERVE_TOKENS - 1500 * count
+                             - self._estimate_tokens(self._batch_prompt(count, designation, experience, domain)))
+                if count > Config.GROQ_BATCH_SIZE or group_tokens + tokens > available:
+                    groups.append(group)
+                    group, group_tokens = [], 0
+            group.append(i)
+            group_tokens += tokens
+        if group:
+            groups.append(group)
+        self.logger.debug("Planned %d request(s) for %d resumes", len(groups), len(indices))
+        return groups
+
+    def _analyze_group(self, texts, designation, experience, domain):
+        """Analyze one group of resumes with a single Groq request, or one request each if the batch fails."""
+        if len(texts) == 1:
+            return self._analyze_each(texts, designation, experience, domain)
+
+        self.logger.debug("Sending batch of %d resumes in one request", len(texts))
+        prompt = self._batch_prompt(len(texts), designation, experience, domain)
+        batch_text = "\n\n".join(f"## Resume {n}\n{text}" for n, text in enumerate(texts, 1))
+        response = self.grok.analyze_text(prompt, batch_text, max_tokens=1500 * len(texts), chunk_size=None)
+        try:
+            return self._parse_batch_response(response, len(texts))
+        except ValueError as e:
+            self.logger.warning("Unusable batch response (%s); analyzing %d resumes individually", str(e), len(texts))
+            return self._analyze_each(texts, designation, experience, domain)
+
+    def _analyze_each(self, texts, designation, experience, domain):
+        """Analyze resumes one request at a time with the single-resume prompt."""
+        prompt = self.prompt_loader.get_prompt(
+            "resume_analysis",
+            designation=designation,
+            experience=experience,
+            domain=domain
+        )
+        return [self.grok.analyze_text(prompt, text, max_tokens=1500) for text in texts]
+
+    @staticmethod
+    def _parse_batch_response(response, count):
+        """Find the JSON array of `count` analyses in a batch response, tolerating raw newlines in strings."""
+        decoder = json.JSONDecoder(strict=False)
+        for match in re.finditer(r"\[", response):
+            try:
+                analyses, _ = decoder.raw_decode(response, match.start())
+            except ValueError:
+                continue
+            if isinstance(analyses, list) and len(analyses) == count and all(isinstance(a, str) for a in analyses):
+                return [analysis.strip() for analysis in analyses]
+        raise ValueError(f"no JSON array of {count} analyses found")
\ No newline at end of file
@@ -1,42 +1,97 @@
-import fitz  # PyMuPDF
-from docx import Document
+import functools
+import io
+import zipfile
+from utils.config import Config
+
+_DOCX_NAMESPACES = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "mc": "http://schemas.openxmlformats.org/markup-compatibility/2006",
+}
+_W_T, _W_TAB = (f"{{{_DOCX_NAMESPACES['w']}}}{tag}" for tag in ("t", "tab"))
+
+@functools.lru_cache(maxsize=None)
+def _get_fitz():
+    """Import PyMuPDF on first use."""
+    import fitz  # PyMuPDF
+    return fitz
+
+@functools.lru_cache(maxsize=None)
+def _get_etree():
+    """Import lxml on first use."""
+    from lxml import etree
+    return etree
+
+def _pdf_text_flags():
+    """Plain-text extraction flags, without image blocks."""
+    fitz = _get_fitz()
+    return fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES
+
+def _docx_paragraph_text(paragraph):
+    """Join a w:p element's own text runs, mapping tabs and breaks the way python-docx does.
+
+    Runs belonging to nested paragraphs (text boxes) are left for those paragraphs.
+    """
+    depth = int(paragraph.xpath("count(ancestor::w:p)", namespaces=_DOCX_NAMESPACES)) + 1
+    nodes = paragraph.xpath(
+        "(.//w:t | .//w:tab | .//w:br | .//w:cr)[count(ancestor::w:p) = $depth and not(ancestor::mc:Fallback)]",
+        namespaces=_DOCX_NAMESPACES, depth=depth
+    )
+    return "".join(
+        (node.text or "") if node.tag == _W_T else "\t" if node.tag == _W_TAB else "\n"
+        for node in nodes
+    )
 
 class TextProcessor:
     """Class to extract text from PDF and DOCX files."""
     def __init__(self, logger):
         self.logger = logger
 
-    def extract_text_from_pdf(self, pdf_path):
-        """Extract text from a PDF file."""
-        self.logger.debug("Extracting text from PDF: %s", pdf_path)
+    def extract_text_from_pdf(self, data):
+        """Extract text from in-memory PDF bytes."""
+        self.logger.debug("Extracting text from PDF (%d bytes)", len(data))
         try:
-            doc = fitz.open(pdf_path)
-            text = "\n".join([page.get_text("text") for page in doc])
-            doc.close()
-            self.logger.debug("Text extracted from PDF: %s", pdf_path)
+            # Text past the Groq input budget would be truncated anyway, so stop reading pages there
+            max_chars = Config.MAX_INPUT_TOKENS * Config.CHARS_PER_TOKEN
+            flags = _pdf_text_flags()
+            buf = io.StringIO()
+            with _get_fitz().open(stream=data, filetype="pdf") as doc:
+                for i, page in enumerate(doc):
+                    if i:
+                        buf.write("\n")
+                    buf.write(page.get_text("text", flags=flags))
+                    if buf.tell() >= max_chars:
+                        self.logger.debug("Input budget reached after %d of %d pages", i + 1, doc.page_count)
+                        break
+            text = buf.getvalue()
+            self.logger.debug("Text extracted from PDF")
             return text
         except Exception as e:
-            self.logger.error("Error extracting text from PDF %s: %s", pdf_path, str(e))
+            self.logger.error("Error extracting text from PDF: %s", str(e))
             raise Exception(f"Error extracting text from PDF: {str(e)}")
 
-    def extract_text_from_docx(self, docx_path):
-        """Extract text from a DOCX file."""
-        self.logger.debug("Extracting text from DOCX: %s", docx_path)
+    def extract_text_from_docx(self, data):
+        """Extract text from in-memory DOCX bytes."""
+        self.logger.debug("Extracting text from DOCX (%d bytes)", len(data))
         try:
-            doc = Document(docx_path)
-            text = "\n".join([para.text for para in doc.paragraphs])
-            self.logger.debug("Text extracted from DOCX: %s", docx_path)
+            etree = _get_etree()
+            parser = etree.XMLParser(resolve_entities=False, no_network=True)
+            with zipfile.ZipFile(io.BytesIO(data)) as archive, archive.open("word/document.xml") as f:
+                root = etree.parse(f, parser).getroot()
+            # Text boxes are their own paragraphs; mc:Fallback holds a duplicate copy of each one
+            paragraphs = root.xpath("//w:body//w:p[not(ancestor::mc:Fallback)]", namespaces=_DOCX_NAMESPACES)
+            text = "\n".join(_docx_paragraph_text(paragraph) for paragraph in paragraphs)
+            self.logger.debug("Text extracted from DOCX")
             return text
         except Exception as e:
-            self.logger.error("Error extracting text from DOCX %s: %s", docx_path, str(e))
+            self.logger.error("Error extracting text from DOCX: %s", str(e))
             raise Exception(f"Error extracting text from DOCX: {str(e)}")
 
-    def extract_text(self, file_path, file_extension):
-        """Extract text based on file extension."""
-        self.logger.debug("Extracting text from file: %s", file_path)
+    def extract_text(self, data, file_extension):
+        """Extract text from file bytes based on file extension."""
+        self.logger.debug("Extracting text from %s file (%d bytes)", file_extension, len(data))
         if file_extension == "pdf":
-            return self.extract_text_from_pdf(file_path)
+            return self.extract_text_from_pdf(data)
         elif file_extension == "docx":
-            return self.extract_text_from_docx(file_path)
+            return self.extract_text_from_docx(data)
         self.logger.warning("Unsupported file extension: %s", file_extension)
         return ""
\ No newline at end of file
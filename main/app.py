@@ -1,17 +1,13 @@
-import sys
-import os
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-
-# Add the project root directory to sys.path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from lib.groq_handler import GroqHandler
 from lib.text_processor import TextProcessor
 from lib.resume_analyzer import ResumeAnalyzer
-from utils.file_utils import save_text_to_file, remove_file
+from utils.file_utils import save_text_to_file, remove_file, file_digest
 from utils.logger import setup_logger
 from utils.config import Config
 from utils.prompt_loader import PromptLoader
+from utils.analysis_cache import AnalysisCache
 
 # Singleton logger setup (runs only once)
 if 'loggers' not in st.session_state:
@@ -21,6 +17,7 @@ if 'loggers' not in st.session_state:
         "groq_handler": setup_logger("groq_handler", f"{Config.LOG_DIR}/groq_handler.log"),
         "prompt_loader": setup_logger("prompt_loader", f"{Config.LOG_DIR}/prompt_loader.log"),
         "resume_analyzer": setup_logger("resume_analyzer", f"{Config.LOG_DIR}/resume_analyzer.log"),
+        "analysis_cache": setup_logger("analysis_cache", f"{Config.LOG_DIR}/analysis_cache.log"),
         "text_processor": setup_logger("text_processor", f"{Config.LOG_DIR}/text_processor.log")
     }
     st.session_state.loggers["app"].debug("Starting Resume Analyzer application")
@@ -28,37 +25,61 @@ if 'loggers' not in st.session_state:
 loggers = st.session_state.loggers
 
 # Cache components to prevent re-initialization
+@st.cache_resource
+def get_prompt_loader():
+    return PromptLoader(Config.PROMPTS_FILE, loggers["prompt_loader"])
+
 @st.cache_resource
 def get_grok_handler():
-    return GroqHandler(loggers["groq_handler"], PromptLoader(Config.PROMPTS_FILE, loggers["prompt_loader"]))
+    return GroqHandler(loggers["groq_handler"], get_prompt_loader())
 
 @st.cache_resource
 def get_text_processor():
     return TextProcessor(loggers["text_processor"])
 
 @st.cache_resource
-def get_resume_analyzer(_grok_handler):
-    return ResumeAnalyzer(_grok_handler, loggers["resume_analyzer"], PromptLoader(Config.PROMPTS_FILE, loggers["prompt_loader"]))
+def get_analysis_cache():
+    # Analyses still work without the cache, e.g. when the cache directory is not writable
+    try:
+        return AnalysisCache(loggers["analysis_cache"])
+    except Exception as e:
+        loggers["app"].error("Analysis cache unavailable, continuing without it: %s", str(e))
+        return None
+
+@st.cache_resource
+def get_resume_analyzer(_grok_handler, _analysis_cache):
+    return ResumeAnalyzer(_grok_handler, loggers["resume_analyzer"], get_prompt_loader(), _analysis_cache)
+
+@st.cache_resource
+def get_extraction_executor():
+    return ThreadPoolExecutor(max_workers=Config.EXTRACTION_WORKERS, thread_name_prefix="text_extraction")
 
-# Initialize components (cached)
-grok_handler = get_grok_handler()
+def analysis_cache_key(file_hash, designation, experience, domain):
+    """Build the session cache key for one resume analysis."""
+    return f"{file_hash}|{designation}|{experience}|{domain}"
+
+# Initialize components (cached); the analyzer is built lazily so its setup can overlap text extraction
 text_processor = get_text_processor()
-resume_analyzer = get_resume_analyzer(grok_handler)
+extraction_executor = get_extraction_executor()
 
 def main():
     """Main function to run the Streamlit Resume Analyzer app."""
     if 'page' not in st.session_state:
         st.session_state.page = "upload"
-    if 'analysis' not in st.session_state:
-        st.session_state.analysis = None
+    if 'analyses' not in st.session_state:
+        st.session_state.analyses = None
     if 'processed' not in st.session_state:
         st.session_state.processed = False
+    if 'analysis_cache' not in st.session_state:
+        st.session_state.analysis_cache = {}
+    if 'text_cache' not in st.session_state:
+        st.session_state.text_cache = {}  # Extracted text by file hash
 
     if st.session_state.page == "upload":
         st.title("Resume Analyzer")
-        st.subheader("Upload a PDF or Word Resume")
+        st.subheader("Upload PDF or Word Resumes")
 
-        uploaded_file = st.file_uploader("Upload Resume", type=["pdf", "docx"])
+        uploaded_files = st.file_uploader("Upload Resumes", type=["pdf", "docx"], accept_multiple_files=True)
         col1, col2, col3 = st.columns(3)
         with col1:
             designation = st.selectbox("Select Desired Designation", ["Data Scientist", "Data Analyst", "MLOps Engineer", "Machine Learning Engineer"])
@@ -67,9 +88,9 @@ def main():
         with col3:
             domain = st.selectbox("Select Domain", ["Finance", "Healthcare", "Automobile", "Real Estate"])
 
-        if st.button("Analyze") and uploaded_file:
-            loggers["app"].debug("User clicked Analyze button for file: %s", uploaded_file.name)
-            st.session_state.uploaded_file = uploaded_file
+        if st.button("Analyze") and uploaded_files:
+            loggers["app"].debug("User clicked Analyze button for files: %s", ", ".join(f.name for f in uploaded_files))
+            st.session_state.uploaded_files = uploaded_files
             st.session_state.designation = designation
             st.session_state.experience = experience
             st.session_state.domain = domain
@@ -78,43 +99,91 @@ def main():
             st.rerun()
 
     elif st.session_state.page == "results":
-        uploaded_file = st.session_state.uploaded_file
-        file_extension = uploaded_file.name.split(".")[-1].lower()
-        temp_path = f"temp_resume.{file_extension}"
+        uploaded_files = st.session_state.uploaded_files
 
         try:
             if not st.session_state.processed:  # Process only once
-                loggers["app"].debug("Processing uploaded file: %s", uploaded_file.name)
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                extracted_text = text_processor.extract_text(temp_path, file_extension)
-                remove_file(temp_path)
-
-                if extracted_text:
-                    loggers["app"].debug("Text extracted successfully, length: %d characters", len(extracted_text))
-                    with st.spinner("Analyzing resume... Please wait"):
-                        st.session_state.analysis = resume_analyzer.analyze_resume(
-                            extracted_text, st.session_state.designation, st.session_state.experience, st.session_state.domain
+                loggers["app"].debug("Processing %d uploaded file(s)", len(uploaded_files))
+                files = [(f.name, f.getvalue()) for f in uploaded_files]
+                file_hashes = [file_digest(data) for _, data in files]
+                cache_keys = [
+                    analysis_cache_key(file_hash, st.session_state.designation, st.session_state.experience, st.session_state.domain)
+                    for file_hash in file_hashes
+                ]
+                pending = [i for i, key in enumerate(cache_keys) if key not in st.session_state.analysis_cache]
+                loggers["app"].debug("Reusing %d cached analyses from session", len(files) - len(pending))
+
+                to_extract = [i for i in pending if file_hashes[i] not in st.session_state.text_cache]
+                futures = [
+                    extraction_executor.submit(text_processor.extract_text, files[i][1], files[i][0].split(".")[-1].lower())
+                    for i in to_extract
+                ]
+                if pending:
+                    # Build the Groq client and analysis cache on this thread while the pool parses files
+                    with st.spinner("Preparing analyzer... Please wait"):
+                        resume_analyzer = get_resume_analyzer(get_grok_handler(), get_analysis_cache())
+                if to_extract:
+                    with st.spinner("Extracting text... Please wait"):
+                        for i, future in zip(to_extract, futures):
+                            st.session_state.text_cache[file_hashes[i]] = future.result()
+                    loggers["app"].debug("Text extracted from %d file(s)", len(to_extract))
+
+                for i in pending:
+                    if not st.session_state.text_cache[file_hashes[i]]:
+                        st.error(f"Could not extract text from {files[i][0]}. Please check the file format.")
+                        loggers["app"].error("Failed to extract text from %s", files[i][0])
+                pending = [i for i in pending if st.session_state.text_cache[file_hashes[i]]]
+
+                streamed = len(files) == 1 and bool(pending)
+                if streamed:
+                    # Stream a single resume's analysis as it is generated, then rerun to render normally
+                    st.markdown("# Resume Analysis")
+                    analysis = st.write_stream(resume_analyzer.analyze_resume(
+                        st.session_state.text_cache[file_hashes[0]],
+                        st.session_state.designation, st.session_state.experience, st.session_state.domain,
+                        stream=True
+                    ))
+                    st.session_state.analysis_cache[cache_keys[0]] = analysis.strip()
+                elif pending:
+                    # Groq calls run on this session's own thread so rate-limit waits never hold shared workers
+                    with st.spinner("Analyzing resumes... Please wait"):
+                        analyses = resume_analyzer.analyze_batch(
+                            [st.session_state.text_cache[file_hashes[i]] for i in pending],
+                            st.session_state.designation, st.session_state.experience, st.session_state.domain
                         )
-                        st.session_state.processed = True
+                    for i, analysis in zip(pending, analyses):
+                        st.session_state.analysis_cache[cache_keys[i]] = analysis
+
+                st.session_state.analyses = [
+                    (name, st.session_state.analysis_cache[key])
+                    for (name, _), key in zip(files, cache_keys) if key in st.session_state.analysis_cache
+                ]
+                if st.session_state.analyses:
+                    st.session_state.processed = True
                     loggers["app"].debug("Resume analysis completed")
-                else:
-                    st.error("Could not extract text. Please check the file format.")
-                    loggers["app"].error("Failed to extract text from %s", uploaded_file.name)
+                    if streamed:
+                        st.rerun()
 
-            if st.session_state.analysis:
+            if st.session_state.analyses:
                 if st.button("Upload New Resume"):
                     loggers["app"].debug("User clicked Upload New Resume")
                     st.session_state.page = "upload"
-                    st.session_state.analysis = None
+                    st.session_state.analyses = None
                     st.session_state.processed = False
                     st.rerun()
 
                 st.markdown("# Resume Analysis")
-                st.write(st.session_state.analysis)
-
+                multiple = len(st.session_state.analyses) > 1
+                for name, analysis in st.session_state.analyses:
+                    if multiple:
+                        st.markdown(f"## {name}")
+                    st.write(analysis)
+
+                report = "\n\n".join(
+                    f"{name}\n{analysis}" if multiple else analysis for name, analysis in st.session_state.analyses
+                )
                 output_filename = "resume_analysis.txt"
-                save_text_to_file(st.session_state.analysis, output_filename)
+                save_text_to_file(report, output_filename)
                 with open(output_filename, "rb") as file:
                     st.download_button(label="Download Analysis", data=file, file_name=output_filename, mime="text/plain")
                 remove_file(output_filename)
@@ -122,7 +191,6 @@ def main():
         except Exception as e:
             loggers["app"].error("Error processing resume: %s", str(e))
             st.error(f"Error processing resume: {str(e)}")
-            remove_file(temp_path)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,70 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import zstandard
+from utils.config import Config
+
+class AnalysisCache:
+    """Class to persist resume analyses on disk, keyed on the exact resume text and role."""
+    def __init__(self, logger, cache_dir=Config.CACHE_DIR):
+        self.logger = logger
+        self.db_path = os.path.join(cache_dir, "analysis_cache.db")
+        self._lock = threading.Lock()
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
+        self.logger.debug("Initializing AnalysisCache at %s", self.db_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "text_hash TEXT NOT NULL, role TEXT NOT NULL, analysis BLOB NOT NULL, "
+                "PRIMARY KEY (text_hash, role))"
+            )
+            self._conn.commit()
+        except Exception as e:
+            self.logger.error("Error initializing analysis cache: %s", str(e))
+            raise Exception(f"Error initializing analysis cache: {str(e)}")
+
+    @staticmethod
+    def _role_key(designation, experience, domain):
+        """Build the role part of the cache key."""
+        return f"{designation}|{experience}|{domain}"
+
+    @staticmethod
+    def _text_hash(text):
+        """Hash the exact resume text; a cached analysis is only reused for identical text."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def lookup(self, text, designation, experience, domain):
+        """Return the cached analysis for identical resume text and role, or None."""
+        role = self._role_key(designation, experience, domain)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT analysis FROM analyses WHERE text_hash = ? AND role = ?",
+                    (self._text_hash(text), role)
+                ).fetchone()
+        except Exception as e:
+            self.logger.warning("Error reading analysis cache: %s", str(e))
+            return None
+        if row is None:
+            self.logger.debug("Analysis cache miss for role: %s", role)
+            return None
+        self.logger.debug("Analysis cache hit for role: %s", role)
+        return self._decompressor.decompress(row[0]).decode("utf-8")
+
+    def store(self, text, designation, experience, domain, analysis):
+        """Persist an analysis, replacing any earlier one for the same text and role."""
+        role = self._role_key(designation, experience, domain)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses (text_hash, role, analysis) VALUES (?, ?, ?)",
+                    (self._text_hash(text), role, self._compressor.compress(analysis.encode("utf-8")))
+                )
+                self._conn.commit()
+            self.logger.debug("Stored analysis in analysis cache for role: %s", role)
+        except Exception as e:
+            self.logger.warning("Error storing analysis in analysis cache: %s", str(e))
@@ -9,6 +9,21 @@ class Config:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     LOG_DIR = "data/logs"
     PROMPTS_FILE = "data/prompts.json"
+    CACHE_DIR = "data/cache"
+    EXTRACTION_WORKERS = 16  # Shared threads for PDF/DOCX text extraction across sessions
+    GROQ_RPM = 30  # Requests per minute allowed by the Groq plan
+    GROQ_MAX_RETRIES = 5  # Attempts per request on rate limits and transient errors
+    GROQ_MAX_RETRY_WAIT = 30  # Seconds; longer 'try again in' hints fail fast instead of blocking
+    GROQ_MAX_CONNECTIONS = 32  # Shared HTTP/2 connection pool for the Groq client
+    GROQ_MAX_KEEPALIVE_CONNECTIONS = 16
+    GROQ_TIMEOUT = 60.0  # Seconds
+    GROQ_CONNECT_TIMEOUT = 5.0
+    MODEL_CONTEXT_TOKENS = 8192  # Context window of gemma2-9b-it (input + output)
+    CONTEXT_RESERVE_TOKENS = 256  # Slack for the chars-per-token estimate and chat formatting
+    MAX_INPUT_TOKENS = 6000  # Input budget per Groq analysis; longer text is truncated
+    CHARS_PER_TOKEN = 4  # Rough token estimate for English text
+    GROQ_BATCH_SIZE = 3  # Max resumes sent to Groq in one batched request
+    GROQ_CACHE_SIZE = 256  # Max analyses kept in the in-process exact-match cache
 
     @staticmethod
     def validate():
@@ -1,4 +1,5 @@
 import os
+from blake3 import blake3
 
 def save_text_to_file(text, output_path):
     """Save text to a file with UTF-8 encoding."""
@@ -8,4 +9,8 @@ def save_text_to_file(text, output_path):
 def remove_file(file_path):
     """Remove a file if it exists."""
     if os.path.exists(file_path):
-        os.remove(file_path)
\ No newline at end of file
+        os.remove(file_path)
+
+def file_digest(data):
+    """Return the BLAKE3 hex digest of raw file bytes."""
+    return blake3(data).hexdigest()
\ No newline at end of file
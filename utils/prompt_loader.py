@@ -1,12 +1,25 @@
+import functools
 import json
 import os
 
+@functools.lru_cache(maxsize=None)
+def _read_prompts_file(prompts_file):
+    """Read and parse a prompts file once per process; .zst files are zstd-compressed JSON."""
+    if prompts_file.endswith(".zst"):
+        import zstandard
+        with open(prompts_file, "rb") as f:
+            return json.loads(zstandard.ZstdDecompressor().decompress(f.read()).decode("utf-8"))
+    with open(prompts_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 class PromptLoader:
     """Class to load and format prompts from a JSON file."""
     def __init__(self, prompts_file, logger):
         self.logger = logger
         self.prompts_file = prompts_file
         self.prompts = self._load_prompts()
+        self._templates = {key: prompt["template"].format for key, prompt in self.prompts.items()}
+        self._format_cached = functools.lru_cache(maxsize=256)(self._format)
 
     def _load_prompts(self):
         """Load prompts from the JSON file."""
@@ -15,8 +28,7 @@ class PromptLoader:
             if not os.path.exists(self.prompts_file):
                 self.logger.error("Prompts file not found: %s", self.prompts_file)
                 raise FileNotFoundError(f"Prompts file not found: {self.prompts_file}")
-            with open(self.prompts_file, "r", encoding="utf-8") as f:
-                prompts = json.load(f)
+            prompts = _read_prompts_file(self.prompts_file)
             self.logger.debug("Prompts loaded successfully")
             return prompts
         except Exception as e:
@@ -29,10 +41,13 @@ class PromptLoader:
             if prompt_key not in self.prompts:
                 self.logger.error("Prompt key not found: %s", prompt_key)
                 raise KeyError(f"Prompt key not found: {prompt_key}")
-            template = self.prompts[prompt_key]["template"]
-            formatted_prompt = template.format(**kwargs)
+            formatted_prompt = self._format_cached(prompt_key, frozenset(kwargs.items()))
             self.logger.debug("Prompt fetched and formatted for key: %s", prompt_key)
             return formatted_prompt
         except Exception as e:
             self.logger.error("Error formatting prompt %s: %s", prompt_key, str(e))
-            raise Exception(f"Error formatting prompt {prompt_key}: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error formatting prompt {prompt_key}: {str(e)}")
+
+    def _format(self, prompt_key, kwargs):
+        """Format a template; wrapped in an LRU cache keyed on (prompt_key, frozenset of kwargs)."""
+        return self._templates[prompt_key](**dict(kwargs))
\ No newline at end of file